@@ -37,7 +37,8 @@ setup(
     include_package_data=True,
     platforms='any',
     entry_points={
-        "console_scripts": ["sq100 = sq100.sq100:main"]},
+        "console_scripts": ["sq100 = sq100.sq100:main",
+                            "sq100-emulator = sq100.emulator:main"]},
     classifiers=[
         'Programming Language :: Python',
         'Development Status :: 1 - Planning',
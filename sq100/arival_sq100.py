@@ -20,7 +20,9 @@ import collections
 import functools
 import datetime
 import logging
+import queue
 import struct
+import threading
 
 from sq100.exceptions import SQ100MessageException
 from sq100.serial_connection import SerialConnection
@@ -34,6 +36,7 @@ Message = collections.namedtuple("Message", [
 
 
 class ArivalSQ100(object):
+    pipeline_depth = 16
 
     def __init__(self, port, baudrate, timeout):
         self.serial = SerialConnection(
@@ -54,6 +57,41 @@ class ArivalSQ100(object):
         return struct.pack(">BH%dsB" % len(payload),
                            start_sequence, payload_length, payload, checksum)
 
+    def _download_tracks(self, msg, no_tracks, next_message):
+        tracks = []
+        for _ in range(no_tracks):
+            track = self._process_get_tracks_track_info_msg(msg)
+            msg = next_message()
+            self._process_get_tracks_lap_info_msg(track, msg)
+            while not track.complete():
+                msg = next_message()
+                self._process_get_tracks_track_points_msg(track, msg)
+            track.update_track_point_times()
+            tracks.append(track)
+            msg = next_message()
+        if not self._is_get_tracks_finish_message(msg):
+            raise SQ100MessageException('expected end of transmission message')
+        return tracks
+
+    def _download_tracks_pipelined(self, msg, no_tracks):
+        messages: queue.Queue[object] = queue.Queue(
+            maxsize=self.pipeline_depth)
+        stop = threading.Event()
+        reader = threading.Thread(
+            target=self._receive_get_tracks_messages, args=(messages, stop))
+        reader.start()
+
+        def next_message():
+            item = messages.get()
+            if isinstance(item, Exception):
+                raise item
+            return item
+        try:
+            return self._download_tracks(msg, no_tracks, next_message)
+        finally:
+            stop.set()
+            reader.join()
+
     @staticmethod
     def _is_get_tracks_finish_message(msg):
         return msg.command == 0x8a
@@ -109,11 +147,30 @@ class ArivalSQ100(object):
 
     def _query(self, command, parameter=b''):
         self.serial.write(self._create_message(command, parameter))
-        "first, read three bytes to determine payload"
-        begin = self.serial.read(3)
-        _, payload = struct.unpack(">BH", begin)
-        rest = self.serial.read(payload + 1)  # +1 for checksum
-        return self._unpack_message(begin + rest)
+        return self._unpack_message(self.serial.read_frame())
+
+    def _receive_get_tracks_messages(self, messages, stop):
+        """keep requesting get_tracks messages until end of transmission
+
+        Runs in the reader thread of a pipelined download and hands the
+        messages (or the exception ending the transfer) to the decoding
+        thread through the bounded messages queue.
+        """
+        def put(item):
+            while not stop.is_set():
+                try:
+                    messages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        try:
+            while not stop.is_set():
+                msg = self._query(0x81)
+                if not put(msg) or self._is_get_tracks_finish_message(msg):
+                    return
+        except Exception as e:
+            put(e)
 
     def _track_ids_to_memory_indices(self, track_ids):
         tracks = self.get_track_list()
@@ -285,22 +342,19 @@ class ArivalSQ100(object):
         logger.info('received list of %i tracks' % len(tracks))
         return tracks
 
-    def get_tracks(self, track_ids):
+    def get_tracks(self, track_ids, pipelined=False):
+        """download the tracks with the given ids
+
+        In pipelined mode, a reader thread keeps requesting and receiving
+        messages while the calling thread decodes the previous ones.
+        """
         memory_indices = self._track_ids_to_memory_indices(track_ids)
         params = self._pack_get_tracks_parameter(memory_indices)
         msg = self._query(0x80, params)
-        tracks = []
-        for _ in range(len(track_ids)):
-            track = self._process_get_tracks_track_info_msg(msg)
-            msg = self._query(0x81)
-            self._process_get_tracks_lap_info_msg(track, msg)
-            while not track.complete():
-                msg = self._query(0x81)
-                self._process_get_tracks_track_points_msg(track, msg)
-            track.update_track_point_times()
-            tracks.append(track)
-            msg = self._query(0x81)
-        if not self._is_get_tracks_finish_message(msg):
-            raise SQ100MessageException('expected end of transmission message')
+        if pipelined and not self._is_get_tracks_finish_message(msg):
+            tracks = self._download_tracks_pipelined(msg, len(track_ids))
+        else:
+            tracks = self._download_tracks(
+                msg, len(track_ids), lambda: self._query(0x81))
         logger.info("number of downloaded tracks: %d", len(tracks))
         return tracks
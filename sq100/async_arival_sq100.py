@@ -0,0 +1,81 @@
+# SQ100 - Serial Communication with the a-rival SQ100 heart rate computer
+# Copyright (C) 2017  Timo Nachstedt
+#
+# This file is part of SQ100.
+#
+# SQ100 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SQ100 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+from sq100.arival_sq100 import ArivalSQ100
+from sq100.async_serial_connection import AsyncSerialConnection
+from sq100.exceptions import SQ100MessageException
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncArivalSQ100(object):
+    """asyncio counterpart of ArivalSQ100
+
+    Message encoding and decoding is shared with ArivalSQ100, only the
+    communication with the device is done on the event loop.
+    """
+
+    def __init__(self, port, baudrate, timeout):
+        self.serial = AsyncSerialConnection(
+            port=port, baudrate=baudrate, timeout=timeout)
+
+    async def _query(self, command, parameter=b''):
+        await self.serial.write(
+            ArivalSQ100._create_message(command, parameter))
+        return ArivalSQ100._unpack_message(await self.serial.read_frame())
+
+    async def _track_ids_to_memory_indices(self, track_ids):
+        tracks = await self.get_track_list()
+        index = {t.id: t.memory_block_index for t in tracks}
+        return [index[track_id] for track_id in track_ids]
+
+    async def connect(self):
+        await self.serial.connect()
+
+    async def disconnect(self):
+        await self.serial.disconnect()
+
+    async def get_track_list(self):
+        msg = await self._query(0x78)
+        tracks = ArivalSQ100._unpack_track_list_parameter(msg.parameter)
+        logger.info('received list of %i tracks' % len(tracks))
+        return tracks
+
+    async def get_tracks(self, track_ids):
+        return [track async for track in self.iter_tracks(track_ids)]
+
+    async def iter_tracks(self, track_ids):
+        """download the tracks with the given ids, yielding each when done"""
+        memory_indices = await self._track_ids_to_memory_indices(track_ids)
+        params = ArivalSQ100._pack_get_tracks_parameter(memory_indices)
+        msg = await self._query(0x80, params)
+        for _ in range(len(track_ids)):
+            track = ArivalSQ100._process_get_tracks_track_info_msg(msg)
+            msg = await self._query(0x81)
+            ArivalSQ100._process_get_tracks_lap_info_msg(track, msg)
+            while not track.complete():
+                msg = await self._query(0x81)
+                ArivalSQ100._process_get_tracks_track_points_msg(track, msg)
+            track.update_track_point_times()
+            yield track
+            msg = await self._query(0x81)
+        if not ArivalSQ100._is_get_tracks_finish_message(msg):
+            raise SQ100MessageException('expected end of transmission message')
@@ -0,0 +1,98 @@
+# SQ100 - Serial Communication with the a-rival SQ100 heart rate computer
+# Copyright (C) 2017  Timo Nachstedt
+#
+# This file is part of SQ100.
+#
+# SQ100 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SQ100 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+import serial
+
+from sq100.exceptions import SQ100SerialException
+from sq100.serial_connection import FrameBuffer
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSerialConnection(object):
+    """Serial connection driven by the readiness of the port's descriptor.
+
+    The port is opened in non-blocking mode and frames are read whenever
+    the event loop reports the descriptor as readable, so that a single
+    loop can serve many ports. The timeout applies to every wait for data.
+    """
+
+    def __init__(self, baudrate=None, port=None, timeout=None):
+        self.serial = serial.Serial()
+        self.frames = FrameBuffer()
+        self.timeout = timeout
+        if baudrate is not None:
+            self.serial.baudrate = baudrate
+        if port is not None:
+            self.serial.port = port
+
+    async def _wait_readable(self):
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+
+        def set_readable():
+            if not readable.done():
+                readable.set_result(None)
+        fd = self.serial.fileno()
+        loop.add_reader(fd, set_readable)
+        try:
+            await asyncio.wait_for(readable, self.timeout)
+        except asyncio.TimeoutError:
+            logger.critical("read timeout occured")
+            raise SQ100SerialException("read timeout")
+        finally:
+            loop.remove_reader(fd)
+
+    async def connect(self):
+        try:
+            self.frames.clear()
+            self.serial.timeout = 0
+            self.serial.open()
+            logger.debug("serial connection on %s", self.serial.portstr)
+        except serial.SerialException:
+            logger.critical("error establishing serial connection")
+            raise SQ100SerialException
+
+    async def disconnect(self):
+        """disconnect the serial connection"""
+        self.serial.close()
+        logger.debug("serial connection closed")
+
+    async def read_frame(self):
+        """read the next response frame, see SerialConnection.read_frame"""
+        frame = self.frames.next_frame()
+        while frame is None:
+            if not self.serial.in_waiting:
+                await self._wait_readable()
+            size = max(self.frames.missing(), self.serial.in_waiting)
+            received = self.serial.readinto(self.frames.writable(size)[:size])
+            self.frames.commit(received)
+            frame = self.frames.next_frame()
+        logger.debug("reading frame of %d bytes", len(frame))
+        return frame
+
+    async def write(self, command):
+        logger.debug("writing data: %s", command)
+        try:
+            self.serial.write(command)
+        except serial.SerialTimeoutException:
+            logger.critical("write timeout occured")
+            raise SQ100SerialException
@@ -0,0 +1,133 @@
+# SQ100 - Serial Communication with the a-rival SQ100 heart rate computer
+# Copyright (C) 2017  Timo Nachstedt
+#
+# This file is part of SQ100.
+#
+# SQ100 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SQ100 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Probing of the fastest reliable baudrate of a device."""
+
+import configparser
+import logging
+import threading
+import time
+
+from sq100.arival_sq100 import ArivalSQ100
+from sq100.exceptions import SQ100Exception, SQ100SerialException
+
+
+logger = logging.getLogger(__name__)
+
+CANDIDATE_BAUDRATES = (460800, 230400, 115200, 57600, 38400)
+
+
+class BaudrateCache(object):
+    """Probed baudrates per port, persisted in a config file."""
+
+    section = "baudrates"
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._config = configparser.ConfigParser()
+        self._config.optionxform = str  # type: ignore
+        self._config.read(filename)
+        if not self._config.has_section(self.section):
+            self._config.add_section(self.section)
+
+    def get(self, port):
+        with self._lock:
+            return self._config.getint(self.section, port, fallback=None)
+
+    def set(self, port, baudrate):
+        with self._lock:
+            self._config.set(self.section, port, str(baudrate))
+            with open(self.filename, "w") as f:
+                self._config.write(f)
+
+
+class ProbeResult(object):
+
+    def __init__(self, baudrate, attempts, failures, round_trip_time):
+        self.baudrate = baudrate
+        self.attempts = attempts
+        self.failures = failures
+        self.round_trip_time = round_trip_time
+
+    @property
+    def reliable(self):
+        return self.failures == 0
+
+
+def probe(port, baudrate, timeout=0.5, attempts=3):
+    """query the track list repeatedly at the given baudrate
+
+    The track list query is the cheapest query that exercises the checksum
+    of a non trivial response. Timeouts and checksum errors are counted as
+    failures, the round trip time is averaged over the successful queries.
+    """
+    computer = ArivalSQ100(port=port, baudrate=baudrate, timeout=timeout)
+    computer.connect()
+    failures = 0
+    times = []
+    try:
+        for _ in range(attempts):
+            start = time.perf_counter()
+            try:
+                computer._query(0x78)
+            except SQ100Exception as e:
+                logger.debug("probing %s at %d failed: %r", port, baudrate, e)
+                failures += 1
+                computer.serial.reset()
+            else:
+                times.append(time.perf_counter() - start)
+    finally:
+        computer.disconnect()
+    return ProbeResult(
+        baudrate=baudrate, attempts=attempts, failures=failures,
+        round_trip_time=sum(times) / len(times) if times else None)
+
+
+def probe_baudrates(port, candidates=CANDIDATE_BAUDRATES, timeout=0.5,
+                    attempts=3):
+    return [probe(port, baudrate, timeout=timeout, attempts=attempts)
+            for baudrate in candidates]
+
+
+def select_baudrate(results, tolerance=0.1):
+    """pick the reliable baudrate with the shortest round trip time
+
+    Round trip times within the relative tolerance of the shortest one are
+    considered equal, in which case the highest baudrate wins.
+    """
+    reliable = [r for r in results if r.reliable]
+    if not reliable:
+        raise SQ100SerialException("no reliable baudrate found")
+    shortest = min(r.round_trip_time for r in reliable)
+    return max(r.baudrate for r in reliable
+               if r.round_trip_time <= shortest * (1 + tolerance))
+
+
+def resolve_baudrate(port, baudrate, cache=None, timeout=0.5):
+    """return baudrate, probing and caching it if it is 'auto'"""
+    if baudrate != "auto":
+        return int(baudrate)
+    cached = cache.get(port) if cache is not None else None
+    if cached is not None:
+        return cached
+    baudrate = select_baudrate(probe_baudrates(port, timeout=timeout))
+    logger.info("selected baudrate %d for %s", baudrate, port)
+    if cache is not None:
+        cache.set(port, baudrate)
+    return baudrate
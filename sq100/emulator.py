@@ -0,0 +1,327 @@
+# SQ100 - Serial Communication with the a-rival SQ100 heart rate computer
+# Copyright (C) 2017  Timo Nachstedt
+#
+# This file is part of SQ100.
+#
+# SQ100 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SQ100 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Emulation of an Arival SQ100 device on a pseudo-terminal.
+
+The emulator opens a pty pair and answers the track list (0x78) and track
+download (0x80, 0x81) commands on the master side, so that the slave side
+can be used as serial port by ArivalSQ100 and the command line interface.
+"""
+
+import argparse
+import datetime
+import logging
+import os
+import select
+import struct
+import threading
+import time
+import tty
+
+from sq100.arival_sq100 import ArivalSQ100
+from sq100.data_types import Lap, Track
+
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">6B3I")
+_LAP_INFO = struct.Struct(">3I3H2B2H13s2H")
+_LAP_INFO_HEADER = struct.Struct(">H8sB")
+_TRACK_INFO = struct.Struct(">3H2B4H13s")
+_TRACK_INFO_HEADER = struct.Struct(">5HB")
+_TRACK_POINT = struct.Struct(">2i3HB2H6s")
+_TRACK_POINT_HEADER = struct.Struct(">H2IB")
+
+
+def _deciseconds(delta):
+    return round(delta.total_seconds() * 10)
+
+
+def _pack_header(track):
+    date = track.date
+    return _HEADER.pack(
+        date.year - 2000, date.month, date.day,
+        date.hour, date.minute, date.second,
+        track.no_track_points, _deciseconds(track.duration), track.distance)
+
+
+def _synthetic_laps(track):
+    no_laps = max(track.no_laps, 1)
+    size = track.no_track_points // no_laps
+    laps = []
+    for i in range(no_laps):
+        first = i * size
+        last = (track.no_track_points if i == no_laps - 1
+                else first + size) - 1
+        duration = datetime.timedelta(seconds=last - first + 1)
+        laps.append(Lap(
+            duration=duration,
+            total_time=datetime.timedelta(seconds=last + 1),
+            distance=track.distance // no_laps,
+            calories=track.calories // no_laps,
+            max_speed=track.max_speed,
+            max_heart_rate=track.max_heart_rate,
+            avg_heart_rate=track.avg_heart_rate,
+            min_height=track.min_height,
+            max_height=track.max_height,
+            first_index=first,
+            last_index=last))
+    return laps
+
+
+def synthetic_track_points(track, first, last):
+    """Raw track point tuples for the indices first to last (inclusive).
+
+    The points are a deterministic function of the track's memory block
+    index and the point index, so they do not have to be kept in memory.
+    """
+    seed = track.memory_block_index
+    return [
+        (51000000 + seed * 1000 + (i * 7) % 20000,
+         9000000 + seed * 1000 + (i * 11) % 20000,
+         100 + i % 50, 0, 1000 + i % 500, 100 + i % 80, 0, 10, b'')
+        for i in range(first, last + 1)]
+
+
+def synthetic_tracks(no_tracks, no_track_points, no_laps=1,
+                     start=datetime.datetime(2020, 1, 1, 8, 0, 0)):
+    """Create a catalog of track headers served by the emulator."""
+    return [
+        Track(
+            ascending_height=120,
+            avg_heart_rate=140,
+            calories=no_track_points // 10,
+            date=start + datetime.timedelta(days=i),
+            descending_height=110,
+            distance=no_track_points * 3,
+            duration=datetime.timedelta(seconds=no_track_points),
+            max_heart_rate=179,
+            max_height=149,
+            max_speed=1499,
+            memory_block_index=i,
+            min_height=100,
+            no_laps=no_laps,
+            no_track_points=no_track_points,
+            track_id=i + 1)
+        for i in range(no_tracks)]
+
+
+class SQ100Emulator(object):
+    """Serve a track catalog on the slave side of a pseudo-terminal.
+
+    If a baudrate is given, responses are throttled to the transfer rate
+    of a serial line with 8N1 framing at that baudrate.
+    """
+
+    def __init__(self, tracks, baudrate=None, points_per_message=200):
+        if len(tracks) * 29 > 0xFFFF:
+            raise ValueError("too many tracks for a single track list")
+        self.tracks = tracks
+        self.baudrate = baudrate
+        self.points_per_message = points_per_message
+        self._master = None
+        self._slave = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._frames = iter(())
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def port(self):
+        return os.ttyname(self._slave)
+
+    @staticmethod
+    def _frame(command, parameter=b''):
+        return (struct.pack(">BH", command, len(parameter)) + parameter
+                + bytes([ArivalSQ100._calc_checksum(parameter)]))
+
+    def _get_tracks_frames(self, memory_indices):
+        index = {t.memory_block_index: t for t in self.tracks}
+        for memory_index in memory_indices:
+            track = index[memory_index]
+            yield self._frame(0x80, self._track_info_parameter(track))
+            yield self._frame(0x81, self._lap_info_parameter(track))
+            for first in range(0, track.no_track_points,
+                               self.points_per_message):
+                last = min(first + self.points_per_message,
+                           track.no_track_points) - 1
+                yield self._frame(
+                    0x81, self._track_point_parameter(track, first, last))
+
+    def _handle(self, command, parameter):
+        if command == 0x78:
+            self._send(self._frame(0x78, self._track_list_parameter()))
+        elif command == 0x80:
+            no_tracks, = struct.unpack_from(">H", parameter)
+            memory_indices = struct.unpack_from(
+                ">%dH" % no_tracks, parameter, 2)
+            self._frames = self._get_tracks_frames(memory_indices)
+            self._send(next(self._frames, self._frame(0x8a)))
+        elif command == 0x81:
+            self._send(next(self._frames, self._frame(0x8a)))
+        else:
+            logger.warning("unsupported command 0x%02x", command)
+
+    def _lap_info_parameter(self, track):
+        laps = track.laps or _synthetic_laps(track)
+        return (
+            _pack_header(track)
+            + _LAP_INFO_HEADER.pack(len(laps), b'', 0xAA)
+            + b''.join(
+                _LAP_INFO.pack(
+                    _deciseconds(lap.duration), _deciseconds(lap.total_time),
+                    lap.distance, lap.calories, 0, lap.max_speed,
+                    lap.max_heart_rate, lap.avg_heart_rate,
+                    lap.min_height, lap.max_height, b'',
+                    lap.first_index, lap.last_index)
+                for lap in laps))
+
+    def _serve(self):
+        buffer = b''
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self._master], [], [], 0.1)
+            if not readable:
+                continue
+            try:
+                buffer += os.read(self._master, 4096)
+            except OSError:
+                break
+            while len(buffer) >= 4:
+                start, length = struct.unpack_from(">BH", buffer)
+                if start != 0x02:
+                    logger.warning("dropping unexpected byte 0x%02x", start)
+                    buffer = buffer[1:]
+                    continue
+                if len(buffer) < length + 4:
+                    break
+                payload = buffer[3:3 + length]
+                checksum = buffer[3 + length]
+                buffer = buffer[4 + length:]
+                if checksum != ArivalSQ100._calc_checksum(payload):
+                    logger.warning("dropping message with wrong checksum")
+                    continue
+                self._handle(payload[0], payload[1:])
+
+    def _send(self, data):
+        view = memoryview(data)
+        if self.baudrate is None:
+            self._write(view)
+            return
+        # 8N1 framing puts ten bits on the wire for every byte
+        chunk = max(1, self.baudrate // 1000)
+        start = time.perf_counter()
+        for offset in range(0, len(view), chunk):
+            part = view[offset:offset + chunk]
+            self._write(part)
+            delay = (start + (offset + len(part)) * 10 / self.baudrate
+                     - time.perf_counter())
+            if delay > 0:
+                time.sleep(delay)
+
+    def _track_info_parameter(self, track):
+        return (
+            _pack_header(track)
+            + _TRACK_INFO_HEADER.pack(
+                track.no_laps, 0, track.memory_block_index, 0, track.id, 0)
+            + _TRACK_INFO.pack(
+                track.calories, 0, track.max_speed,
+                track.max_heart_rate, track.avg_heart_rate,
+                track.ascending_height, track.descending_height,
+                track.min_height, track.max_height, b''))
+
+    def _track_list_parameter(self):
+        return b''.join(
+            _pack_header(track)
+            + _TRACK_INFO_HEADER.pack(
+                track.no_laps, 0, track.memory_block_index, 0, track.id, 0)
+            for track in self.tracks)
+
+    def _track_point_parameter(self, track, first, last):
+        points = synthetic_track_points(track, first, last)
+        parameter = bytearray(29 + len(points) * _TRACK_POINT.size)
+        parameter[:18] = _pack_header(track)
+        _TRACK_POINT_HEADER.pack_into(
+            parameter, 18, track.no_laps, first, last, 0x55)
+        for i, point in enumerate(points):
+            _TRACK_POINT.pack_into(
+                parameter, 29 + i * _TRACK_POINT.size, *point)
+        return bytes(parameter)
+
+    def _write(self, view):
+        while view:
+            written = os.write(self._master, view)
+            view = view[written:]
+
+    def start(self):
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        logger.info("emulating SQ100 on %s", self.port)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Emulate an Arival SQ100 on a pseudo-terminal')
+    parser.add_argument(
+        "-n", "--tracks",
+        help="number of tracks on the emulated device",
+        type=int, default=10)
+    parser.add_argument(
+        "-p", "--points",
+        help="number of track points per track",
+        type=int, default=1000)
+    parser.add_argument(
+        "-l", "--laps",
+        help="number of laps per track",
+        type=int, default=1)
+    parser.add_argument(
+        "-b", "--baudrate",
+        help="throttle the responses to this baudrate",
+        type=int, default=None)
+    args = parser.parse_args()
+
+    tracks = synthetic_tracks(args.tracks, args.points, args.laps)
+    with SQ100Emulator(tracks, baudrate=args.baudrate) as emulator:
+        print("emulating SQ100 on %s" % emulator.port)
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
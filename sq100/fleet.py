@@ -0,0 +1,110 @@
+# SQ100 - Serial Communication with the a-rival SQ100 heart rate computer
+# Copyright (C) 2017  Timo Nachstedt
+#
+# This file is part of SQ100.
+#
+# SQ100 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SQ100 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Download the tracks of many devices in parallel."""
+
+import concurrent.futures
+import glob
+import logging
+import os
+import time
+
+from sq100.arival_sq100 import ArivalSQ100
+from sq100.baudrate import resolve_baudrate
+from sq100.exceptions import SQ100Exception
+from sq100.gpx import tracks_to_gpx
+
+
+logger = logging.getLogger(__name__)
+
+
+class DeviceResult(object):
+
+    def __init__(self, port, directory, no_tracks=0, no_track_points=0,
+                 seconds=0.0, error=None):
+        self.port = port
+        self.directory = directory
+        self.no_tracks = no_tracks
+        self.no_track_points = no_track_points
+        self.seconds = seconds
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def device_directory(output_dir, port):
+    return os.path.join(output_dir, os.path.basename(port.rstrip(os.sep)))
+
+
+def download_device(port, baudrate, timeout, output_dir, pipelined=False,
+                    baudrate_cache=None):
+    """download all tracks of the device at port into its own directory"""
+    result = DeviceResult(port, device_directory(output_dir, port))
+    start = time.perf_counter()
+    try:
+        baudrate = resolve_baudrate(port, baudrate, baudrate_cache)
+        computer = ArivalSQ100(port=port, baudrate=baudrate, timeout=timeout)
+        computer.connect()
+        try:
+            track_ids = [t.id for t in computer.get_track_list()]
+            tracks = (computer.get_tracks(track_ids, pipelined=pipelined)
+                      if track_ids else [])
+        finally:
+            computer.disconnect()
+        os.makedirs(result.directory, exist_ok=True)
+        for track in tracks:
+            tracks_to_gpx([track], os.path.join(
+                result.directory, "downloaded_tracks-%s.gpx" % track.id))
+        result.no_tracks = len(tracks)
+        result.no_track_points = sum(len(t.track_points) for t in tracks)
+    except (SQ100Exception, OSError) as e:
+        logger.error("download from %s failed: %r", port, e)
+        result.error = str(e) or e.__class__.__name__
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def download_fleet(ports, baudrate, timeout, output_dir, jobs=None,
+                   pipelined=False, baudrate_cache=None):
+    """download all tracks of all devices using a pool of workers
+
+    Every device is handled by its own worker unless the number of jobs is
+    limited, so a stuck port only delays its own download until the serial
+    timeout kicks in. The results are returned in the order of the ports.
+    """
+    if not ports:
+        return []
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=jobs or len(ports)) as pool:
+        futures = [
+            pool.submit(download_device, port, baudrate, timeout, output_dir,
+                        pipelined, baudrate_cache)
+            for port in ports]
+        return [future.result() for future in futures]
+
+
+def expand_ports(patterns):
+    """expand glob patterns, keeping patterns without matches as they are"""
+    ports = []
+    for pattern in patterns:
+        for port in sorted(glob.glob(pattern)) or [pattern]:
+            if port not in ports:
+                ports.append(port)
+    return ports
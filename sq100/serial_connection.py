@@ -25,11 +25,68 @@ from sq100.exceptions import SQ100SerialException
 logger = logging.getLogger(__name__)
 
 
+class FrameBuffer(object):
+    """Preallocated receive buffer slicing out complete response frames.
+
+    A frame consists of the command byte, the big endian payload length,
+    the payload and the checksum byte. Frames are handed out as memoryviews
+    into the buffer, which stay valid until the next call of writable().
+    """
+
+    def __init__(self, size=8192):
+        self._buffer = bytearray(size)
+        self._start = 0
+        self._end = 0
+
+    def _frame_length(self):
+        if self._end - self._start < 3:
+            return None
+        return 4 + int.from_bytes(
+            self._buffer[self._start + 1:self._start + 3], 'big')
+
+    def clear(self):
+        self._start = self._end = 0
+
+    def commit(self, size):
+        """mark size bytes written to the last writable() view as received"""
+        self._end += size
+
+    def missing(self):
+        """number of bytes at least required to complete the next frame"""
+        length = self._frame_length()
+        if length is None:
+            return 3 - (self._end - self._start)
+        return max(0, length - (self._end - self._start))
+
+    def next_frame(self):
+        """return the next complete frame or None"""
+        length = self._frame_length()
+        if length is None or self._end - self._start < length:
+            return None
+        frame = memoryview(self._buffer)[self._start:self._start + length]
+        self._start += length
+        return frame
+
+    def writable(self, size):
+        """return a view of at least size free bytes at the buffer end"""
+        if self._end + size > len(self._buffer):
+            pending = self._end - self._start
+            if pending + size > len(self._buffer):
+                buffer = bytearray(max(2 * len(self._buffer), pending + size))
+                buffer[:pending] = self._buffer[self._start:self._end]
+                self._buffer = buffer
+            else:
+                self._buffer[:pending] = self._buffer[self._start:self._end]
+            self._start, self._end = 0, pending
+        return memoryview(self._buffer)[self._end:]
+
+
 class SerialConnection():
     _sleep = 2
 
     def __init__(self, baudrate=None, port=None, timeout=None):
         self.serial = serial.Serial()
+        self.frames = FrameBuffer()
         if baudrate is not None:
             self.baudrate = baudrate
         if port is not None:
@@ -66,6 +123,7 @@ class SerialConnection():
 
     def connect(self):
         try:
+            self.frames.clear()
             self.serial.open()
             logger.debug("serial connection on %s", self.serial.portstr)
         except serial.SerialException:
@@ -90,6 +148,32 @@ class SerialConnection():
         logger.debug("reading data:: %s", data)
         return data
 
+    def read_frame(self):
+        """read the next response frame
+
+        Whatever is waiting at the port is pulled into the receive buffer
+        with a single read, so that consecutive frames usually need only
+        one read each. The returned memoryview is only valid until the next
+        call of read_frame.
+        """
+        frame = self.frames.next_frame()
+        while frame is None:
+            size = max(self.frames.missing(), self.serial.in_waiting)
+            received = self.serial.readinto(
+                self.frames.writable(size)[:size])
+            if not received:
+                logger.critical("read timeout occured")
+                raise SQ100SerialException("read timeout")
+            self.frames.commit(received)
+            frame = self.frames.next_frame()
+        logger.debug("reading frame of %d bytes", len(frame))
+        return frame
+
+    def reset(self):
+        """discard all received but not yet consumed data"""
+        self.frames.clear()
+        self.serial.reset_input_buffer()
+
     def query(self, command):
         for attempt in range(3):
             self.write(command)
@@ -24,11 +24,15 @@ import cmd
 import configparser
 import logging
 import tabulate
+import time
 
 from sq100.arival_sq100 import ArivalSQ100
+from sq100.baudrate import (
+    BaudrateCache, probe_baudrates, resolve_baudrate, select_baudrate)
 from sq100.exceptions import SQ100SerialException
+from sq100.fleet import download_fleet, expand_ports
 from sq100.gpx import tracks_to_gpx
-from sq100.utilities import parse_range
+from sq100.utilities import parse_baudrate, parse_range
 
 logging.basicConfig(filename="sq100.log", level=logging.DEBUG)
 
@@ -41,13 +45,19 @@ class SQ100(object):
         self.serial_comport = config['serial'].get("comport")
         self.serial_baudrate = config['serial'].get('baudrate')
         self.serial_timeout = config['serial'].get('timeout')
+        self.baudrate_cache = BaudrateCache(config['serial'].get(
+            'baudrate_cache', 'sq100-baudrates.cfg'))
+        self.pipelined = False
         self.computer = None
 
     def connect(self):
-        self.computer = ArivalSQ100(port=self.serial_comport,
-                                    baudrate=self.serial_baudrate,
-                                    timeout=self.serial_timeout)
         try:
+            baudrate = resolve_baudrate(
+                self.serial_comport, self.serial_baudrate,
+                self.baudrate_cache)
+            self.computer = ArivalSQ100(port=self.serial_comport,
+                                        baudrate=baudrate,
+                                        timeout=self.serial_timeout)
             self.computer.connect()
             return True
         except SQ100SerialException:
@@ -77,6 +87,28 @@ class SQ100(object):
         print("* %s waypoints on watch" % unit['waypoint_count'])
         print("* %s trackpoints on watch" % unit['trackpoint_count'])
 
+    def download_fleet(self, ports, output_dir, jobs=None):
+        ports = expand_ports(ports)
+        start = time.perf_counter()
+        results = download_fleet(
+            ports, baudrate=self.serial_baudrate, timeout=self.serial_timeout,
+            output_dir=output_dir, jobs=jobs, pipelined=self.pipelined,
+            baudrate_cache=self.baudrate_cache)
+        seconds = time.perf_counter() - start
+        table = [[r.port, r.directory, r.no_tracks, r.no_track_points,
+                  "%.1f" % r.seconds, "ok" if r.ok else r.error]
+                 for r in results]
+        headers = ["port", "directory", "tracks", "trkpnts", "seconds",
+                   "status"]
+        print(tabulate.tabulate(table, headers=headers))
+        no_track_points = sum(r.no_track_points for r in results)
+        print("%d of %d devices failed" %
+              (sum(not r.ok for r in results), len(results)))
+        print("downloaded %d tracks with %d track points in %.1f s "
+              "(%.0f track points/s)" %
+              (sum(r.no_tracks for r in results), no_track_points, seconds,
+               no_track_points / seconds if seconds else 0))
+
     def download_latest(self):
         track_headers = self.computer.get_track_list()
         if len(track_headers) == 0:
@@ -85,14 +117,16 @@ class SQ100(object):
         latest = sorted(track_headers, key=lambda t: t.date)[-1]
         print("latest track: %s, %s m, %s" %
               (latest.date, latest.distance, latest.duration))
-        tracks = self.computer.get_tracks([latest.id])
+        tracks = self.computer.get_tracks(
+            [latest.id], pipelined=self.pipelined)
         tracks_to_gpx(
             tracks, "track-%s.gpx" % latest.date.strftime("%Y-%m-%d-%H-%M-%S"))
 
     def download_tracks(self, track_ids=[], merge=False):
         if len(track_ids) == 0:
             return
-        tracks = self.computer.get_tracks(track_ids)
+        tracks = self.computer.get_tracks(
+            track_ids, pipelined=self.pipelined)
         if merge:
             tracks_to_gpx(tracks, "downloaded_tracks.gpx")
             return
@@ -111,6 +145,26 @@ class SQ100(object):
         print("Sorry! Exporting all tracks is not yet implemented.")
         return
 
+    def probe_baudrate(self):
+        try:
+            results = probe_baudrates(self.serial_comport)
+        except SQ100SerialException:
+            print("Connection to device failed! Check serial settings.")
+            return
+        table = [[r.baudrate, r.attempts, r.failures,
+                  "-" if r.round_trip_time is None
+                  else "%.1f" % (r.round_trip_time * 1000)]
+                 for r in results]
+        headers = ["baudrate", "attempts", "failures", "round trip [ms]"]
+        print(tabulate.tabulate(table, headers=headers))
+        try:
+            baudrate = select_baudrate(results)
+        except SQ100SerialException:
+            print("no reliable baudrate found")
+            return
+        self.baudrate_cache.set(self.serial_comport, baudrate)
+        print("selected baudrate %d for %s" % (baudrate, self.serial_comport))
+
     def show_tracklist(self):
         tracks = self.computer.get_track_list()
         if tracks:
@@ -246,14 +300,18 @@ def main():
         default=sq100.serial_comport)
     parser.add_argument(
         "-b", "--baudrate",
-        help="baudrate for serial communication",
-        type=int,
+        help="baudrate for serial communication or 'auto' to probe it",
+        type=parse_baudrate,
         default=sq100.serial_baudrate)
     parser.add_argument(
         "-t", "--timeout",
         help="timeout for serial communication",
         type=int,
         default=sq100.serial_timeout)
+    parser.add_argument(
+        "-p", "--pipelined",
+        help="decode tracks while the next messages are transferred",
+        action="store_true")
     subparsers = parser.add_subparsers(dest="command")
 
     subparsers.add_parser("list")
@@ -277,6 +335,22 @@ def main():
         help="download latest track",
         action="store_true")
 
+    subparsers.add_parser("probe")
+
+    parser_fleet = subparsers.add_parser("fleet")
+    parser_fleet.add_argument(
+        "ports",
+        help="serial ports or glob patterns like /dev/ttyUSB*",
+        nargs='+')
+    parser_fleet.add_argument(
+        "-o", "--output",
+        help="directory receiving one sub directory per device",
+        default="fleet")
+    parser_fleet.add_argument(
+        "-j", "--jobs",
+        help="number of devices downloaded in parallel (default: all)",
+        type=int)
+
 #     parser.add_argument(
 #         "-i", "--input",
 #         help="input file(s)",
@@ -289,6 +363,14 @@ def main():
     sq100.serial_comport = args.comport
     sq100.serial_baudrate = args.baudrate
     sq100.serial_timeout = args.timeout
+    sq100.pipelined = args.pipelined
+
+    if args.command == "fleet":
+        sq100.download_fleet(args.ports, args.output, jobs=args.jobs)
+        return
+    if args.command == "probe":
+        sq100.probe_baudrate()
+        return
 
     if sq100.connect() is False:
         return
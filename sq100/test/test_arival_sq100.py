@@ -22,7 +22,7 @@ import struct
 from mock import call, create_autospec, patch
 
 from sq100.arival_sq100 import ArivalSQ100, Message
-from sq100.exceptions import SQ100MessageException
+from sq100.exceptions import SQ100MessageException, SQ100SerialException
 from sq100.data_types import Track
 
 """
@@ -163,13 +163,13 @@ def test_process_get_tracks_track_points_msg_wrong_session_length(mock_unpack):
 def test_query(mock_serial_connection, mock_unpack, mock_create):
     mock_serial = mock_serial_connection.return_value
     sq100 = ArivalSQ100(port=None, baudrate=None, timeout=None)
-    mock_serial.read.side_effect = [b'\x00\x00\x0c', b'timo']
+    mock_serial.read_frame.return_value = b'\x00\x00\x03timo'
     mock_create.return_value = "sent message"
     mock_unpack.return_value = "unpacked data"
     assert sq100._query("the command", "the parameter") == "unpacked data"
     mock_create.assert_called_once_with('the command', 'the parameter')
-    mock_serial.read.assert_has_calls([call(3), call(13)])
-    mock_unpack.assert_called_once_with(b'\x00\x00\x0ctimo')
+    mock_serial.write.assert_called_once_with("sent message")
+    mock_unpack.assert_called_once_with(b'\x00\x00\x03timo')
 
 
 @patch.object(ArivalSQ100, "get_track_list")
@@ -616,6 +616,7 @@ def test_get_track_list(mock_unpack, mock_query):
     mock_unpack.assert_called_once_with("the parameter")
 
 
+@pytest.mark.parametrize("pipelined", [False, True])
 @patch('sq100.arival_sq100.ArivalSQ100._is_get_tracks_finish_message')
 @patch('sq100.arival_sq100.ArivalSQ100._process_get_tracks_track_points_msg')
 @patch('sq100.arival_sq100.ArivalSQ100._process_get_tracks_lap_info_msg')
@@ -626,7 +627,7 @@ def test_get_track_list(mock_unpack, mock_query):
 @patch('sq100.arival_sq100.ArivalSQ100._track_ids_to_memory_indices')
 def test_get_tracks(mock_id2index, mock_pack, mock_update_tp_times, mock_query,
                     mock_process_track_info, mock_process_lap_info,
-                    mock_process_track_points, mock_is_finish):
+                    mock_process_track_points, mock_is_finish, pipelined):
     sq100 = ArivalSQ100(port=None, baudrate=None, timeout=None)
     mock_id2index.return_value = "the indices"
     mock_pack.return_value = "the request parameter"
@@ -649,7 +650,7 @@ def test_get_tracks(mock_id2index, mock_pack, mock_update_tp_times, mock_query,
     mock_process_track_points.side_effect = track_points_side_effect
     mock_is_finish.side_effect = lambda msg: msg == "the end"
 
-    tracks = sq100.get_tracks([1, 5])
+    tracks = sq100.get_tracks([1, 5], pipelined=pipelined)
     assert tracks[0].name == "track info 1"
     assert tracks[0].laps == "lap info 1"
     assert tracks[0].track_points == ["track points 1.1", "track points 1.2"]
@@ -672,9 +673,13 @@ def test_get_tracks(mock_id2index, mock_pack, mock_update_tp_times, mock_query,
         call(tracks[0], "track points 1.2"),
         call(tracks[1], "track points 2.1"),
         call(tracks[1], "track points 2.2")])
-    mock_is_finish.assert_called_once_with("the end")
+    if pipelined:
+        mock_is_finish.assert_called_with("the end")
+    else:
+        mock_is_finish.assert_called_once_with("the end")
 
 
+@pytest.mark.parametrize("pipelined", [False, True])
 @patch('sq100.arival_sq100.ArivalSQ100._is_get_tracks_finish_message')
 @patch('sq100.arival_sq100.ArivalSQ100._process_get_tracks_track_points_msg')
 @patch('sq100.arival_sq100.ArivalSQ100._process_get_tracks_lap_info_msg')
@@ -684,7 +689,8 @@ def test_get_tracks(mock_id2index, mock_pack, mock_update_tp_times, mock_query,
 @patch('sq100.arival_sq100.ArivalSQ100._track_ids_to_memory_indices')
 def test_get_tracks_no_finish(mock_id2index, mock_pack, mock_query,
                               mock_process_track_info, mock_process_lap_info,
-                              mock_process_track_points, mock_is_finish):
+                              mock_process_track_points, mock_is_finish,
+                              pipelined):
     sq100 = ArivalSQ100(port=None, baudrate=None, timeout=None)
     mock_id2index.return_value = "the indices"
     mock_pack.return_value = "the request parameter"
@@ -711,4 +717,18 @@ def test_get_tracks_no_finish(mock_id2index, mock_pack, mock_query,
     mock_is_finish.side_effect = lambda msg: msg == "the end"
 
     with pytest.raises(SQ100MessageException):
-        sq100.get_tracks([5])
+        sq100.get_tracks([5], pipelined=pipelined)
+
+
+@patch.object(ArivalSQ100, '_query')
+@patch('sq100.arival_sq100.ArivalSQ100._pack_get_tracks_parameter')
+@patch('sq100.arival_sq100.ArivalSQ100._track_ids_to_memory_indices')
+def test_get_tracks_pipelined_reader_failure(mock_id2index, mock_pack,
+                                             mock_query):
+    sq100 = ArivalSQ100(port=None, baudrate=None, timeout=None)
+    track_info = create_autospec(Message)
+    track_info.command = 0x80
+    mock_query.side_effect = [track_info, SQ100SerialException("timeout")]
+    with patch.object(ArivalSQ100, '_process_get_tracks_track_info_msg'):
+        with pytest.raises(SQ100SerialException):
+            sq100.get_tracks([5], pipelined=True)
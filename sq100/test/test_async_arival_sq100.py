@@ -0,0 +1,79 @@
+# SQ100 - Serial Communication with the a-rival SQ100 heart rate computer
+# Copyright (C) 2017  Timo Nachstedt
+#
+# This file is part of SQ100.
+#
+# SQ100 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SQ100 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import pytest
+
+from sq100.async_arival_sq100 import AsyncArivalSQ100
+from sq100.emulator import SQ100Emulator, synthetic_tracks
+from sq100.exceptions import SQ100SerialException
+
+
+@pytest.fixture
+def emulators():
+    emulators = [
+        SQ100Emulator(synthetic_tracks(no_tracks=2, no_track_points=300))
+        for _ in range(2)]
+    for emulator in emulators:
+        emulator.start()
+    yield emulators
+    for emulator in emulators:
+        emulator.stop()
+
+
+def test_get_track_list(emulators):
+    async def run():
+        device = AsyncArivalSQ100(
+            port=emulators[0].port, baudrate=115200, timeout=2)
+        await device.connect()
+        try:
+            return await device.get_track_list()
+        finally:
+            await device.disconnect()
+    tracks = asyncio.run(run())
+    assert [t.id for t in tracks] == [1, 2]
+
+
+def test_iter_tracks_on_many_devices(emulators):
+    async def download(port):
+        device = AsyncArivalSQ100(port=port, baudrate=115200, timeout=2)
+        await device.connect()
+        try:
+            return [track async for track in device.iter_tracks([2, 1])]
+        finally:
+            await device.disconnect()
+
+    async def run():
+        return await asyncio.gather(
+            *(download(emulator.port) for emulator in emulators))
+    for tracks in asyncio.run(run()):
+        assert [t.id for t in tracks] == [2, 1]
+        assert all(len(t.track_points) == 300 for t in tracks)
+
+
+def test_read_timeout(emulators):
+    async def run():
+        device = AsyncArivalSQ100(
+            port=emulators[0].port, baudrate=115200, timeout=0.2)
+        await device.connect()
+        try:
+            await device._query(0x42)
+        finally:
+            await device.disconnect()
+    with pytest.raises(SQ100SerialException):
+        asyncio.run(run())
@@ -0,0 +1,92 @@
+# SQ100 - Serial Communication with the a-rival SQ100 heart rate computer
+# Copyright (C) 2017  Timo Nachstedt
+#
+# This file is part of SQ100.
+#
+# SQ100 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SQ100 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+from mock import patch
+
+import sq100.baudrate as baudrate
+from sq100.emulator import SQ100Emulator, synthetic_tracks
+from sq100.exceptions import SQ100MessageException, SQ100SerialException
+
+
+def test_cache(tmp_path):
+    filename = str(tmp_path / "baudrates.cfg")
+    cache = baudrate.BaudrateCache(filename)
+    assert cache.get("COM2") is None
+    cache.set("COM2", 230400)
+    cache.set("/dev/ttyUSB0", 57600)
+    cache = baudrate.BaudrateCache(filename)
+    assert cache.get("COM2") == 230400
+    assert cache.get("/dev/ttyUSB0") == 57600
+
+
+@patch('sq100.baudrate.ArivalSQ100')
+def test_probe_counts_failures(mock_arival_sq100):
+    computer = mock_arival_sq100.return_value
+    computer._query.side_effect = [
+        "the track list", SQ100MessageException("checksum wrong"),
+        SQ100SerialException("read timeout")]
+    result = baudrate.probe("COM2", 57600, attempts=3)
+    assert result.baudrate == 57600
+    assert result.failures == 2
+    assert result.reliable is False
+    assert result.round_trip_time is not None
+    assert computer.serial.reset.call_count == 2
+    computer.disconnect.assert_called_once_with()
+
+
+def test_probe_with_emulator():
+    tracks = synthetic_tracks(no_tracks=5, no_track_points=10)
+    with SQ100Emulator(tracks) as emulator:
+        result = baudrate.probe(emulator.port, 115200)
+    assert result.reliable
+    assert result.round_trip_time > 0
+
+
+def test_select_baudrate():
+    results = [
+        baudrate.ProbeResult(460800, 3, 1, 0.01),
+        baudrate.ProbeResult(230400, 3, 0, 0.02),
+        baudrate.ProbeResult(115200, 3, 0, 0.03),
+        baudrate.ProbeResult(57600, 3, 0, 0.02)]
+    assert baudrate.select_baudrate(results) == 230400
+
+
+def test_select_baudrate_prefers_higher_baudrate_on_par():
+    results = [
+        baudrate.ProbeResult(230400, 3, 0, 0.0105),
+        baudrate.ProbeResult(115200, 3, 0, 0.0100),
+        baudrate.ProbeResult(57600, 3, 0, 0.0200)]
+    assert baudrate.select_baudrate(results) == 230400
+
+
+def test_select_baudrate_none_reliable():
+    with pytest.raises(SQ100SerialException):
+        baudrate.select_baudrate([baudrate.ProbeResult(57600, 3, 3, None)])
+
+
+@patch('sq100.baudrate.probe_baudrates')
+def test_resolve_baudrate(mock_probe_baudrates, tmp_path):
+    cache = baudrate.BaudrateCache(str(tmp_path / "baudrates.cfg"))
+    mock_probe_baudrates.return_value = [
+        baudrate.ProbeResult(230400, 3, 0, 0.02)]
+    assert baudrate.resolve_baudrate("COM2", 9600, cache) == 9600
+    assert baudrate.resolve_baudrate("COM2", "auto", cache) == 230400
+    assert baudrate.resolve_baudrate("COM2", "auto", cache) == 230400
+    mock_probe_baudrates.assert_called_once()
+    assert cache.get("COM2") == 230400
@@ -0,0 +1,86 @@
+# SQ100 - Serial Communication with the a-rival SQ100 heart rate computer
+# Copyright (C) 2017  Timo Nachstedt
+#
+# This file is part of SQ100.
+#
+# SQ100 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SQ100 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import datetime
+import pytest
+
+from sq100.arival_sq100 import ArivalSQ100
+from sq100.emulator import SQ100Emulator, synthetic_tracks
+
+
+@pytest.fixture
+def emulator():
+    tracks = synthetic_tracks(no_tracks=3, no_track_points=450, no_laps=2)
+    with SQ100Emulator(tracks, points_per_message=200) as emulator:
+        yield emulator
+
+
+@pytest.fixture
+def device(emulator):
+    device = ArivalSQ100(port=emulator.port, baudrate=115200, timeout=2)
+    device.connect()
+    yield device
+    device.disconnect()
+
+
+def test_synthetic_tracks():
+    tracks = synthetic_tracks(no_tracks=2, no_track_points=100)
+    assert [t.id for t in tracks] == [1, 2]
+    assert [t.memory_block_index for t in tracks] == [0, 1]
+    assert tracks[1].date - tracks[0].date == datetime.timedelta(days=1)
+    assert all(t.no_track_points == 100 for t in tracks)
+
+
+def test_too_many_tracks():
+    with pytest.raises(ValueError):
+        SQ100Emulator(synthetic_tracks(no_tracks=3000, no_track_points=1))
+
+
+def test_get_track_list(emulator, device):
+    tracks = device.get_track_list()
+    assert len(tracks) == 3
+    for track, expected in zip(tracks, emulator.tracks):
+        assert track.compatible_to(expected)
+
+
+def test_get_tracks(emulator, device):
+    tracks = device.get_tracks([3, 1])
+    assert [t.id for t in tracks] == [3, 1]
+    assert tracks[0].compatible_to(emulator.tracks[2])
+    assert len(tracks[0].track_points) == 450
+    assert len(tracks[0].laps) == 2
+    assert tracks[0].laps[1].last_index == 449
+    assert tracks[0].track_points[-1].date == (
+        tracks[0].date + datetime.timedelta(seconds=450))
+
+
+def test_get_tracks_pipelined(emulator, device):
+    tracks = device.get_tracks([2, 3], pipelined=True)
+    assert [t.id for t in tracks] == [2, 3]
+    assert all(len(t.track_points) == 450 for t in tracks)
+
+
+def test_throttled_transfer():
+    tracks = synthetic_tracks(no_tracks=1, no_track_points=100)
+    with SQ100Emulator(tracks, baudrate=115200) as emulator:
+        device = ArivalSQ100(port=emulator.port, baudrate=115200, timeout=2)
+        device.connect()
+        try:
+            assert len(device.get_tracks([1])[0].track_points) == 100
+        finally:
+            device.disconnect()
@@ -0,0 +1,52 @@
+# SQ100 - Serial Communication with the a-rival SQ100 heart rate computer
+# Copyright (C) 2017  Timo Nachstedt
+#
+# This file is part of SQ100.
+#
+# SQ100 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SQ100 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+from sq100.emulator import SQ100Emulator, synthetic_tracks
+from sq100.fleet import download_fleet, expand_ports
+
+
+def test_expand_ports(tmp_path):
+    for name in ["ttyUSB1", "ttyUSB0", "ttyS0"]:
+        (tmp_path / name).touch()
+    ports = expand_ports([str(tmp_path / "ttyUSB*"), "COM3",
+                          str(tmp_path / "ttyUSB0")])
+    assert ports == [str(tmp_path / "ttyUSB0"), str(tmp_path / "ttyUSB1"),
+                     "COM3"]
+
+
+def test_download_fleet(tmp_path):
+    emulators = [
+        SQ100Emulator(synthetic_tracks(no_tracks=n, no_track_points=50))
+        for n in (1, 2)]
+    for emulator in emulators:
+        emulator.start()
+    try:
+        ports = [emulators[0].port, "/dev/does-not-exist", emulators[1].port]
+        results = download_fleet(ports, baudrate=115200, timeout=2,
+                                 output_dir=str(tmp_path))
+    finally:
+        for emulator in emulators:
+            emulator.stop()
+    assert [r.port for r in results] == ports
+    assert [r.ok for r in results] == [True, False, True]
+    assert [r.no_tracks for r in results] == [1, 0, 2]
+    assert results[2].no_track_points == 100
+    assert sorted(os.listdir(results[2].directory)) == [
+        "downloaded_tracks-1.gpx", "downloaded_tracks-2.gpx"]
@@ -20,7 +20,7 @@ from mock import patch, MagicMock
 import serial
 import pytest
 
-from sq100.serial_connection import SerialConnection
+from sq100.serial_connection import FrameBuffer, SerialConnection
 from sq100.exceptions import SQ100SerialException
 
 
@@ -157,3 +157,79 @@ def test_query_fails():
         connection.query(command)
     assert connection.write.call_count == 3
     assert connection.read.call_count == 3
+
+
+def _readinto_from(data):
+    stream = bytearray(data)
+
+    def readinto(view):
+        size = min(len(view), len(stream))
+        view[:size] = stream[:size]
+        del stream[:size]
+        return size
+    return readinto
+
+
+def test_frame_buffer():
+    frames = FrameBuffer(size=8)
+    assert frames.missing() == 3
+    assert frames.next_frame() is None
+    view = frames.writable(3)
+    view[:3] = b'\x81\x00\x02'
+    frames.commit(3)
+    assert frames.missing() == 3
+    view = frames.writable(7)
+    view[:7] = b'ab\xff\x8a\x00\x00\x00'
+    frames.commit(7)
+    assert frames.missing() == 0
+    assert bytes(frames.next_frame()) == b'\x81\x00\x02ab\xff'
+    assert bytes(frames.next_frame()) == b'\x8a\x00\x00\x00'
+    assert frames.next_frame() is None
+
+
+@patch("serial.Serial")
+def test_read_frame(MockSerial):
+    instance = MockSerial.return_value
+    instance.in_waiting = 0
+    instance.readinto.side_effect = _readinto_from(
+        b'\x81\x00\x03abc\xff\x8a\x00\x00\x00')
+    connection = SerialConnection()
+    assert bytes(connection.read_frame()) == b'\x81\x00\x03abc\xff'
+    assert bytes(connection.read_frame()) == b'\x8a\x00\x00\x00'
+    assert instance.readinto.call_count == 4
+
+
+@patch("serial.Serial")
+def test_read_frame_reads_waiting_bytes_at_once(MockSerial):
+    instance = MockSerial.return_value
+    instance.in_waiting = 11
+    instance.readinto.side_effect = _readinto_from(
+        b'\x81\x00\x03abc\xff\x8a\x00\x00\x00')
+    connection = SerialConnection()
+    assert bytes(connection.read_frame()) == b'\x81\x00\x03abc\xff'
+    assert bytes(connection.read_frame()) == b'\x8a\x00\x00\x00'
+    instance.readinto.assert_called_once()
+
+
+@patch("serial.Serial")
+def test_read_frame_timeout(MockSerial):
+    instance = MockSerial.return_value
+    instance.in_waiting = 0
+    instance.readinto.side_effect = _readinto_from(b'\x81\x00')
+    connection = SerialConnection()
+    with pytest.raises(SQ100SerialException):
+        connection.read_frame()
+
+
+@patch("serial.Serial")
+def test_reset(MockSerial):
+    instance = MockSerial.return_value
+    instance.in_waiting = 0
+    instance.readinto.side_effect = _readinto_from(b'\x81\x00\x05a')
+    connection = SerialConnection()
+    with pytest.raises(SQ100SerialException):
+        connection.read_frame()
+    assert connection.frames.missing() == 5
+    connection.reset()
+    instance.reset_input_buffer.assert_called_once_with()
+    assert connection.frames.missing() == 3
@@ -32,6 +32,10 @@ def calc_tracks_bounds(tracks):
         maximum=Point(latitude=max_latitude, longitude=max_longitude))
 
 
+def parse_baudrate(astr):
+    return astr if astr == "auto" else int(astr)
+
+
 def parse_range(astr):
     result: Set[int] = set()
     for part in astr.split(','):